@@ -2,16 +2,31 @@
 A micropython library to interface with EEPROM 93cx6 series.
 """
 
+import sys
+import micropython
+from micropython import const
+from array import array
+from os import uname
 from utime import sleep_us as usleep
-from machine import Pin
+from machine import Pin, SPI, mem32
 
+try:
+    import asyncio
+except ImportError:
+    try:
+        import uasyncio as asyncio
+    except ImportError:
+        asyncio = None
 
-__DEBUG = False
+try:
+    import rp2
+except ImportError:
+    rp2 = None
 
 
-def debug(tag, content):
-    if __DEBUG:
-        print(f"{tag}: {content}")
+def _require_asyncio():
+    if asyncio is None:
+        raise ImportError("asyncio is required for Ring and *_async methods")
 
 
 DELAY_CS = 0
@@ -19,9 +34,34 @@ DELAY_READ = 1
 DELAY_WRITE = 1
 DELAY_WAIT = 1
 
+# Number of DO polls in wait_ready before it starts sleeping DELAY_WAIT
+_WAIT_SPINS = const(256)
+
 EEPROM_MODE_8BIT = 1
 EEPROM_MODE_16BIT = 2
 
+# (org, model): (number of words, address bits, address mask)
+_PARAMS = {
+    (EEPROM_MODE_8BIT, 46): (128, 7, 0x7F),
+    (EEPROM_MODE_8BIT, 56): (256, 9, 0x1FF),
+    (EEPROM_MODE_8BIT, 66): (512, 9, 0x1FF),
+    (EEPROM_MODE_8BIT, 76): (1024, 11, 0x7FF),
+    (EEPROM_MODE_8BIT, 86): (2048, 11, 0x7FF),
+    (EEPROM_MODE_16BIT, 46): (64, 6, 0x3F),
+    (EEPROM_MODE_16BIT, 56): (128, 8, 0xFF),
+    (EEPROM_MODE_16BIT, 66): (256, 8, 0xFF),
+    (EEPROM_MODE_16BIT, 76): (512, 10, 0x3FF),
+    (EEPROM_MODE_16BIT, 86): (1024, 10, 0x3FF),
+}
+
+# RP2040 SIO registers, one 32-bit store sets/clears any set of GPIO outputs.
+# (RP2350 reports the same sys.platform but has a different SIO layout.)
+_SIO_GPIO_IN = const(0xD0000004)
+_SIO_GPIO_OUT_SET = const(0xD0000014)
+_SIO_GPIO_OUT_CLR = const(0xD0000018)
+# RP2040 pad control, GPIOn at +4 + 4n: DRIVE(bit 5:4) 2/4/8/12mA, SLEWFAST(bit 0)
+_PADS_BANK0_GPIO0 = const(0x4001C004)
+
 
 class OP:
     CONTROL: int = 0x00
@@ -57,7 +97,7 @@ class Device:
      CS(Chip Select)
     """
 
-    def __init__(self, model, cs, sk, di, do, org=EEPROM_MODE_16BIT):
+    def __init__(self, model, cs, sk, di, do, org=EEPROM_MODE_16BIT, drive=None):
         self.model = model
         if model not in [46, 56, 66, 76, 86]:
             raise ValueError(
@@ -68,105 +108,272 @@ class Device:
             raise ValueError(
                 f"Device.org must be `EEPROM_MODE_8BIT` or `EEPROM_MODE_16BIT`, given value: {org}"
             )
+        self._sio = sys.platform == "rp2" and "RP2040" in uname().machine
         self.cs = Pin(cs, Pin.OUT)
-        self.sk = Pin(sk, Pin.OUT)
-        self.di = Pin(di, Pin.OUT)
+        if drive is None:
+            self.sk = Pin(sk, Pin.OUT)
+            self.di = Pin(di, Pin.OUT)
+        elif self._sio:
+            # rp2 Pin has no drive argument: set the pads directly, slow slew
+            if drive not in [0, 1, 2, 3]:
+                raise ValueError(
+                    f"Device.drive must be 0-3(2/4/8/12mA) on RP2040, given value: {drive}"
+                )
+            self.sk = Pin(sk, Pin.OUT)
+            self.di = Pin(di, Pin.OUT)
+            for pin in (sk, di):
+                pad = _PADS_BANK0_GPIO0 + 4 * pin
+                mem32[pad] = (mem32[pad] & ~0x31) | (drive << 4)
+        elif sys.platform == "rp2":
+            raise ValueError(
+                f"Device.drive is only supported on RP2040 among rp2 chips, given value: {drive}"
+            )
+        else:
+            self.sk = Pin(sk, Pin.OUT, drive=drive)
+            self.di = Pin(di, Pin.OUT, drive=drive)
         self.do = Pin(do, Pin.IN)
-        self.bytes = Device.get_bytes_by_model(org, model)
-        self.addr = Device.get_addr_by_model(org, model)
-        self.mask = Device.get_mask_by_model(org, model)
+        self._sk_mask = 1 << sk
+        self._di_mask = 1 << di
+        self._do_mask = 1 << do
+        self.bytes, self.addr, self.mask = _PARAMS[(org, model)]
+        self._num_bits = 16 if org == EEPROM_MODE_16BIT else 8
+        self._value_mask = (1 << self._num_bits) - 1
+        self._op_bits = self.addr + 2
+        self._read_op = OP.READ << self.addr
+        self._write_op = OP.WRITE << self.addr
+        self._erase_op = OP.ERASE << self.addr
         self._ew = False
 
-    @staticmethod
-    def get_bytes_by_model(org: int, model: int) -> int:
-        if org == EEPROM_MODE_8BIT:
-            byte = 128
-        elif org == EEPROM_MODE_16BIT:
-            byte = 64
-
-        if model == 56:  # 256/128
-            byte *= 2
-        elif model == 66:  # 512/256
-            byte *= 4
-        elif model == 76:  # 1024/512
-            byte *= 8
-        elif model == 86:  # 2048/1024
-            byte *= 16
-        return byte
-
-    @staticmethod
-    def get_addr_by_model(org: int, model: int) -> int:
-        if org == EEPROM_MODE_8BIT:
-            addr = 7
-        elif org == EEPROM_MODE_16BIT:
-            addr = 6
-
-        if model == 56 or model == 66:  # 9/8
-            addr += 2
-        if model == 76 or model == 86:  # 11/10
-            addr += 4
-        return addr
-
-    @staticmethod
-    def get_mask_by_model(org: int, model: int) -> int:
-        if org == EEPROM_MODE_8BIT:
-            mask = 0x7F
-        elif org == EEPROM_MODE_16BIT:
-            mask = 0x3F
-        if model == 56 or model == 66:  # 0x1ff/0xff
-            mask = (mask << 2) + 0x03
-        if model == 76 or model == 86:  # 0x7ff/0x3ff
-            mask = (mask << 4) + 0x0F
-        return mask
-
     def validate_addr(self, addr):
         """Validate if given address is in range of memory space"""
         if addr < 0 or addr > (self.bytes - 1):  # address is 0-origin
             raise ValueError(f"Address exceeds maximum address({self.addr:04x})")
 
+    def validate_value(self, value):
+        """Validate if given value fits in a word of memory"""
+        if value < 0 or value > self._value_mask:
+            raise ValueError(f"Value exceeds maximum value({self._value_mask:04x})")
+
+    @micropython.viper
     def send_bits(self, value: int, length: int):
         """Send value through a DI pin"""
-        for i in range(length - 1, -1, -1):
-            send_bit = value & 1 << i
-            if send_bit:
-                self.di.on()
+        delay = DELAY_WRITE
+        mask = 1 << (length - 1)
+        if self._sio:
+            out_set = ptr32(_SIO_GPIO_OUT_SET)
+            out_clr = ptr32(_SIO_GPIO_OUT_CLR)
+            di_mask = int(self._di_mask)
+            sk_mask = int(self._sk_mask)
+            while mask:
+                if value & mask:
+                    out_set[0] = di_mask
+                else:
+                    out_clr[0] = di_mask
+                if delay:
+                    usleep(delay)
+                out_set[0] = sk_mask
+                if delay:
+                    usleep(delay)
+                out_clr[0] = sk_mask
+                if delay:
+                    usleep(delay)
+                mask >>= 1
+            return
+
+        di = self.di.value
+        sk = self.sk.value
+        while mask:
+            if value & mask:
+                di(1)
+            else:
+                di(0)
+            if delay:
+                usleep(delay)
+            sk(1)
+            if delay:
+                usleep(delay)
+            sk(0)
+            if delay:
+                usleep(delay)
+            mask >>= 1
+
+    @micropython.viper
+    def _send_start_bit(self):
+        """Send a start bit(a single 1) through a DI pin"""
+        delay = DELAY_WRITE
+        if self._sio:
+            out_set = ptr32(_SIO_GPIO_OUT_SET)
+            out_clr = ptr32(_SIO_GPIO_OUT_CLR)
+            sk_mask = int(self._sk_mask)
+            out_set[0] = int(self._di_mask)
+            if delay:
+                usleep(delay)
+            out_set[0] = sk_mask
+            if delay:
+                usleep(delay)
+            out_clr[0] = sk_mask
+            if delay:
+                usleep(delay)
+            return
+
+        sk = self.sk.value
+        self.di.value(1)
+        if delay:
+            usleep(delay)
+        sk(1)
+        if delay:
+            usleep(delay)
+        sk(0)
+        if delay:
+            usleep(delay)
+
+    @micropython.viper
+    def recv_bits(self, length: int) -> int:
+        """Receive a value of given length through a DO pin"""
+        delay = DELAY_READ
+        value = 0
+        if self._sio:
+            gpio_in = ptr32(_SIO_GPIO_IN)
+            out_set = ptr32(_SIO_GPIO_OUT_SET)
+            out_clr = ptr32(_SIO_GPIO_OUT_CLR)
+            do_mask = int(self._do_mask)
+            sk_mask = int(self._sk_mask)
+            for i in range(length):
+                out_set[0] = sk_mask
+                if delay:
+                    usleep(delay)
+                value <<= 1
+                if gpio_in[0] & do_mask:
+                    value |= 1
+                out_clr[0] = sk_mask
+                if delay:
+                    usleep(delay)
+            return value
+
+        do = self.do.value
+        sk = self.sk.value
+        for i in range(length):
+            sk(1)
+            if delay:
+                usleep(delay)
+            value = (value << 1) | int(do())
+            sk(0)
+            if delay:
+                usleep(delay)
+        return value
+
+    @micropython.viper
+    def _recv_into(self, buf, count: int):
+        """Receive count words through a DO pin into buf (array('H') or bytearray)"""
+        delay = DELAY_READ
+        num_bits = int(self._num_bits)
+        out8 = ptr8(buf)
+        out16 = ptr16(buf)
+        if self._sio:
+            gpio_in = ptr32(_SIO_GPIO_IN)
+            out_set = ptr32(_SIO_GPIO_OUT_SET)
+            out_clr = ptr32(_SIO_GPIO_OUT_CLR)
+            do_mask = int(self._do_mask)
+            sk_mask = int(self._sk_mask)
+            for n in range(count):
+                value = 0
+                for i in range(num_bits):
+                    out_set[0] = sk_mask
+                    if delay:
+                        usleep(delay)
+                    value <<= 1
+                    if gpio_in[0] & do_mask:
+                        value |= 1
+                    out_clr[0] = sk_mask
+                    if delay:
+                        usleep(delay)
+                if num_bits == 16:
+                    out16[n] = value
+                else:
+                    out8[n] = value
+            return
+
+        do = self.do.value
+        sk = self.sk.value
+        for n in range(count):
+            value = 0
+            for i in range(num_bits):
+                sk(1)
+                if delay:
+                    usleep(delay)
+                value = (value << 1) | int(do())
+                sk(0)
+                if delay:
+                    usleep(delay)
+            if num_bits == 16:
+                out16[n] = value
             else:
-                self.di.off()
-            usleep(DELAY_WRITE)
-            self.sk.on()
-            usleep(DELAY_WRITE)
-            self.sk.off()
-            usleep(DELAY_WRITE)
+                out8[n] = value
+
+    def _select(self):
+        """Set CS to high to start a new instruction"""
+        self.cs.on()
+        if DELAY_CS:
+            usleep(DELAY_CS)
+
+    def _deselect(self):
+        """Set CS to low to finish an instruction"""
+        self.cs.off()
 
+    @micropython.viper
     def wait_ready(self):
         """Wait for EEPROM to verify a written value"""
-        debug("wait_ready", "setting cs to high")
         self.cs.on()
-        debug("wait_ready", "set cs to high, waiting dev_do to low")
-        while self.do.value() != 1:
-            usleep(DELAY_WAIT)
+        spin = _WAIT_SPINS
+        if self._sio:
+            gpio_in = ptr32(_SIO_GPIO_IN)
+            do_mask = int(self._do_mask)
+            while not (gpio_in[0] & do_mask):
+                if spin:
+                    spin -= 1
+                else:
+                    usleep(DELAY_WAIT)
+        else:
+            do = self.do.value
+            while not int(do()):
+                if spin:
+                    spin -= 1
+                else:
+                    usleep(DELAY_WAIT)
+        self.cs.off()
+
+    async def wait_ready_async(self):
+        """Wait for EEPROM to verify a written value, letting other asyncio
+        tasks run between polls of DO"""
+        _require_asyncio()
+        self.cs.on()
+        spin = _WAIT_SPINS
+        while not self.do.value():
+            if spin:
+                spin -= 1
+                await asyncio.sleep_ms(0)
+            else:
+                await asyncio.sleep_ms(1)
         self.cs.off()
 
     def ew_enable(self):
         """Enable Erase/Write feature(EWEN)"""
-        self.cs.on()
-        usleep(DELAY_CS)
-        self.send_bits(1, 1)
+        self._select()
+        self._send_start_bit()
         self.send_bits(
-            OP.CONTROL << self.addr | CC.EW_ENABLE << (self.addr - 2), self.addr + 2
+            OP.CONTROL << self.addr | CC.EW_ENABLE << (self.addr - 2), self._op_bits
         )
-        self.cs.off()
+        self._deselect()
         self._ew = True
 
     def ew_disable(self) -> None:
         """Disable Erase/Write feature(EWDS)"""
-        self.cs.on()
-        usleep(DELAY_CS)
-        self.send_bits(1, 1)  # start bit
+        self._select()
+        self._send_start_bit()
         self.send_bits(
-            OP.CONTROL << self.addr | CC.EW_ENABLE << (self.addr - 2), self.addr + 2
+            OP.CONTROL << self.addr | CC.EW_DISABLE << (self.addr - 2), self._op_bits
         )
-        self.cs.off()
+        self._deselect()
         self._ew = False
 
     def ew_enabled(self) -> bool:
@@ -177,115 +384,419 @@ class Device:
         """Perform a ERASE ALL feature"""
         if not self.ew_enabled():
             return
-        self.cs.on()
-        usleep(DELAY_CS)
-        self.send_bits(1, 1)  # start bit
+        self._erase_all()
+        self.wait_ready()
+
+    async def erase_all_async(self) -> None:
+        """Same as erase_all(), but yields to other tasks while EEPROM erases"""
+        _require_asyncio()
+        if not self.ew_enabled():
+            return
+        self._erase_all()
+        await self.wait_ready_async()
+
+    def _erase_all(self) -> None:
+        self._select()
+        self._send_start_bit()
         self.send_bits(
-            OP.CONTROL << self.addr | CC.ERASE_ALL << (self.addr - 2), self.addr + 2
+            OP.CONTROL << self.addr | CC.ERASE_ALL << (self.addr - 2), self._op_bits
         )
-        self.cs.off()
-        self.wait_ready()
+        self._deselect()
 
     def erase(self, addr: int) -> None:
         """Erase a value of given address"""
         if not self.ew_enabled():
             return
-        self.cs.on()
-        usleep(DELAY_CS)
-        self.send_bits(1, 1)  # start bit
-        self.send_bits(OP.ERASE << self.addr | (addr & self.mask), self.addr + 2)
-        self.cs.off()
+        self._erase(addr)
         self.wait_ready()
 
+    async def erase_async(self, addr: int) -> None:
+        """Same as erase(), but yields to other tasks while EEPROM erases"""
+        _require_asyncio()
+        if not self.ew_enabled():
+            return
+        self._erase(addr)
+        await self.wait_ready_async()
+
+    def _erase(self, addr: int) -> None:
+        """Send an ERASE instruction, without waiting for it to complete"""
+        self._select()
+        self._send_start_bit()
+        self.send_bits(self._erase_op | (addr & self.mask), self._op_bits)
+        self._deselect()
+
     def write_all(self, value):
         """Perform a WRITE ALL feature with given value"""
         if not self.ew_enabled():
             return
-        self.cs.on()
-        usleep(DELAY_CS)
-        self.send_bits(1, 1)  # start bit
+        self.validate_value(value)
+        self._write_all(value)
+        self.wait_ready()
+
+    async def write_all_async(self, value):
+        """Same as write_all(), but yields to other tasks while EEPROM verifies"""
+        _require_asyncio()
+        if not self.ew_enabled():
+            return
+        self.validate_value(value)
+        self._write_all(value)
+        await self.wait_ready_async()
+
+    def _write_all(self, value):
+        self._select()
+        self._send_start_bit()
         self.send_bits(
-            OP.CONTROL << self.addr | CC.WRITE_ALL << (self.addr - 2), self.addr + 2
+            OP.CONTROL << self.addr | CC.WRITE_ALL << (self.addr - 2), self._op_bits
         )
-        if self.org == EEPROM_MODE_16BIT:
-            self.send_bits(0xFFFF & value, 16)
-        elif self.org == EEPROM_MODE_8BIT:
-            self.send_bits(0xFF & value, 8)
-        self.cs.off()
-        self.wait_ready()
+        self.send_bits(value, self._num_bits)
+        self._deselect()
 
     def write(self, addr: int, value: int) -> None:
         """Write value to given address"""
         if not self.ew_enabled():
             return
         self.validate_addr(addr)
-
-        self.cs.on()
-        usleep(DELAY_CS)
-        self.send_bits(1, 1)  # start bits
-        self.send_bits(OP.WRITE << self.addr | (addr & self.mask), self.addr + 2)
-        if self.org == EEPROM_MODE_16BIT:
-            self.send_bits(0xFFFF & value, 16)
-        elif self.org == EEPROM_MODE_8BIT:
-            self.send_bits(0xFF & value, 8)
-        self.cs.off()
+        self.validate_value(value)
+        self._write(addr, value)
         self.wait_ready()
 
+    async def write_async(self, addr: int, value: int) -> None:
+        """Same as write(), but yields to other tasks while EEPROM verifies"""
+        _require_asyncio()
+        if not self.ew_enabled():
+            return
+        self.validate_addr(addr)
+        self.validate_value(value)
+        self._write(addr, value)
+        await self.wait_ready_async()
+
+    def write_sequential(self, addr: int, values) -> None:
+        """Write values to consecutive addresses starting from given address.
+        93cx6 has no page write, so every value is still sent by its own WRITE
+        instruction, but E/W state, address range and values are all checked
+        before the first write."""
+        if not self.ew_enabled():
+            return
+        if not values:
+            return
+        self.validate_addr(addr)
+        self.validate_addr(addr + len(values) - 1)
+        for value in values:
+            self.validate_value(value)
+
+        for value in values:
+            self._write(addr, value)
+            self.wait_ready()
+            addr += 1
+
+    async def write_sequential_async(self, addr: int, values) -> None:
+        """Same as write_sequential(), but yields to other tasks while EEPROM
+        verifies each value"""
+        _require_asyncio()
+        if not self.ew_enabled():
+            return
+        if not values:
+            return
+        self.validate_addr(addr)
+        self.validate_addr(addr + len(values) - 1)
+        for value in values:
+            self.validate_value(value)
+
+        for value in values:
+            self._write(addr, value)
+            await self.wait_ready_async()
+            addr += 1
+
+    def _write(self, addr: int, value: int) -> None:
+        """Send a WRITE instruction, without waiting for it to complete"""
+        self._select()
+        self._send_start_bit()
+        self.send_bits(self._write_op | (addr & self.mask), self._op_bits)
+        self.send_bits(value, self._num_bits)
+        self._deselect()
+
     def read(self, addr: int) -> int:
         """Read a value of given address from EEPROM"""
         self.validate_addr(addr)
 
-        self.cs.on()
-        usleep(DELAY_CS)
-        self.send_bits(1, 1)  # start bit
-
-        self.send_bits(OP.READ << self.addr | (addr & self.mask), self.addr + 2)
-
-        if self.org == EEPROM_MODE_16BIT:
-            num_bits = 16
-        elif self.org == EEPROM_MODE_8BIT:
-            num_bits = 8
-
-        read_value = 0
-        for i in range(num_bits, 0, -1):
-            self.sk.on()
-            usleep(DELAY_READ)
-            read_bit = self.do.value()
-            self.sk.off()
-            usleep(DELAY_READ)
-            read_value = read_value | (read_bit << (i - 1))
-        self.cs.off()
+        self._select()
+        self._send_start_bit()
+
+        self.send_bits(self._read_op | (addr & self.mask), self._op_bits)
+        read_value = self.recv_bits(self._num_bits)
+        self._deselect()
         return read_value
 
     def read_sequential(self, addr: int, length: int):
         """Perform a sequential read of given address and length.
-        Returns a list of values.
+        Returns an array('H') of values (a bytearray in 8-bit mode).
         If address exceeds maximum memory adderss, this function will stop and
-        return a list at that time."""
+        return values read until then."""
         self.validate_addr(addr)
 
-        arr = []
-        self.cs.on()
-        usleep(DELAY_CS)
-        self.send_bits(1, 1)  # start bits
-        self.send_bits(OP.READ << self.addr | (addr & self.mask), self.addr + 2)
-        if self.org == EEPROM_MODE_16BIT:
-            num_bits = 16
-        elif self.org == EEPROM_MODE_8BIT:
-            num_bits = 8
-
-        for count in range(length):
-            read_value = 0
-            if addr + count > self.bytes:
-                break
-            for i in range(num_bits, 0, -1):
-                self.sk.on()
-                usleep(DELAY_READ)
-                read_bit = self.do.value()
-                self.sk.off()
-                usleep(DELAY_READ)
-                read_value = read_value | (read_bit << (i - 1))
-            arr.append(read_value)
-
-        self.cs.off()
+        self._select()
+        self._send_start_bit()
+        self.send_bits(self._read_op | (addr & self.mask), self._op_bits)
+        length = max(0, min(length, self.bytes - addr))
+        if self._num_bits == 16:
+            arr = array("H", bytes(length * 2))
+        else:
+            arr = bytearray(length)
+        self._recv_into(arr, length)
+
+        self._deselect()
         return arr
+
+
+class Ring:
+    """A submission/completion queue pair in front of a Device.
+    Commands are queued with submit() and executed in order by the run() task,
+    which lets other tasks run while the EEPROM programs a word. Results are
+    collected with reap() as (tag, result); an exception raised by a command is
+    re-raised by the reap() of that command instead.
+    The device must not be used directly while run() is active."""
+
+    def __init__(self, dev: Device, depth: int = 16):
+        _require_asyncio()
+        self.dev = dev
+        self.depth = depth
+        self._sq = array("I", bytes(4 * 4 * depth))  # op, addr, value, tag
+        self._cq = array("I", bytes(4 * 2 * depth))  # tag, result
+        self._cq_error = [None] * depth
+        self._sq_head = 0
+        self._sq_tail = 0
+        self._cq_head = 0
+        self._cq_tail = 0
+        self._submitted = asyncio.Event()
+        self._completed = asyncio.Event()
+
+    def submit(self, op: int, addr: int, value: int = 0, tag: int = 0) -> None:
+        """Queue OP.READ, OP.WRITE or OP.ERASE of given address.
+        tag is returned with the result by reap()."""
+        if op not in (OP.READ, OP.WRITE, OP.ERASE):
+            raise ValueError(f"Ring.submit op must be READ, WRITE or ERASE: {op}")
+        self.dev.validate_addr(addr)
+        if op != OP.READ and not self.dev.ew_enabled():
+            raise ValueError("Ring.submit WRITE/ERASE requires ew_enable()")
+        if op == OP.WRITE:
+            self.dev.validate_value(value)
+        # Commands not reaped yet still own a CQ slot
+        if self._sq_tail - self._cq_head >= self.depth:
+            raise RuntimeError("Ring is full, reap() completions first")
+        i = (self._sq_tail % self.depth) * 4
+        sq = self._sq
+        sq[i] = op
+        sq[i + 1] = addr
+        sq[i + 2] = value
+        sq[i + 3] = tag
+        self._sq_tail += 1
+        self._submitted.set()
+
+    async def run(self):
+        """Execute submitted commands forever, run it as an asyncio task"""
+        dev = self.dev
+        sq = self._sq
+        cq = self._cq
+        while True:
+            while self._sq_head == self._sq_tail:
+                self._submitted.clear()
+                await self._submitted.wait()
+            i = (self._sq_head % self.depth) * 4
+            op, addr, value, tag = sq[i], sq[i + 1], sq[i + 2], sq[i + 3]
+            self._sq_head += 1
+
+            result = 0
+            error = None
+            try:
+                if op == OP.READ:
+                    result = dev.read(addr)
+                elif not dev.ew_enabled():
+                    raise ValueError("Erase/Write got disabled before the command ran")
+                elif op == OP.WRITE:
+                    await dev.write_async(addr, value)
+                else:
+                    await dev.erase_async(addr)
+            except Exception as e:  # handed to reap(), run() must keep going
+                error = e
+
+            j = (self._cq_tail % self.depth) * 2
+            cq[j] = tag
+            cq[j + 1] = result
+            self._cq_error[j // 2] = error
+            self._cq_tail += 1
+            self._completed.set()
+            # READ never awaits, let reap() and other tasks in between commands
+            await asyncio.sleep_ms(0)
+
+    async def reap(self):
+        """Wait for the next completed command, return (tag, result).
+        Re-raises the exception if the command failed."""
+        while self._cq_head == self._cq_tail:
+            self._completed.clear()
+            await self._completed.wait()
+        j = (self._cq_head % self.depth) * 2
+        self._cq_head += 1
+        error = self._cq_error[j // 2]
+        if error is not None:
+            self._cq_error[j // 2] = None
+            raise error
+        return self._cq[j], self._cq[j + 1]
+
+
+if rp2:
+
+    @rp2.asm_pio(
+        out_init=rp2.PIO.OUT_LOW,
+        sideset_init=rp2.PIO.OUT_LOW,
+        out_shiftdir=rp2.PIO.SHIFT_LEFT,
+        in_shiftdir=rp2.PIO.SHIFT_LEFT,
+    )
+    def _pio_shift():
+        # TX FIFO: number of bits - 1, then the bits left-justified (MSB first).
+        # Every bit drives DI while SK is low and samples DO at the end of SK
+        # high; the sampled bits are pushed to RX FIFO as one word.
+        pull().side(0)
+        mov(x, osr).side(0)
+        pull().side(0)
+        label("bit")
+        out(pins, 1).side(0)[1]
+        nop().side(1)[1]
+        in_(pins, 1).side(1)
+        jmp(x_dec, "bit").side(0)
+        push().side(0)
+
+
+class PIODevice(Device):
+    """A 93cx6 chip clocked by a RP2040 PIO state machine.
+    SK, DI and DO are driven by the state machine, so the SK rate is freq / 6
+    whatever MicroPython is doing. CS and wait_ready() still use GPIO."""
+
+    def __init__(
+        self,
+        model,
+        cs,
+        sk,
+        di,
+        do,
+        org=EEPROM_MODE_16BIT,
+        drive=None,
+        sm_id=0,
+        freq=2_000_000,
+    ):
+        if rp2 is None:
+            raise ValueError("PIODevice is only supported on rp2 port")
+        super().__init__(model, cs, sk, di, do, org, drive)
+        self._sm = rp2.StateMachine(
+            sm_id,
+            _pio_shift,
+            freq=freq,
+            sideset_base=self.sk,
+            out_base=self.di,
+            in_base=self.do,
+        )
+        self._sm.active(1)
+
+    def _shift(self, value: int, length: int) -> int:
+        """Send length bits of value and return length bits received meanwhile"""
+        sm = self._sm
+        sm.put(length - 1)
+        sm.put((value << (32 - length)) & 0xFFFFFFFF)
+        return sm.get()
+
+    def send_bits(self, value: int, length: int):
+        """Send value through a DI pin"""
+        self._shift(value, length)
+
+    def _send_start_bit(self):
+        self._shift(1, 1)
+
+    def recv_bits(self, length: int) -> int:
+        """Receive a value of given length through a DO pin"""
+        return self._shift(0, length)
+
+    def _recv_into(self, buf, count: int):
+        num_bits = self._num_bits
+        for n in range(count):
+            buf[n] = self._shift(0, num_bits)
+
+
+class SPIDevice(Device):
+    """A 93cx6 chip clocked by a hardware SPI peripheral(mode 0, MSB first).
+    Bits of an instruction are buffered and sent as a single SPI transfer,
+    padded with leading zeros to whole bytes; 93cx6 ignores DI until the start
+    bit. CS and wait_ready() still use GPIO."""
+
+    def __init__(
+        self,
+        model,
+        cs,
+        sk,
+        di,
+        do,
+        org=EEPROM_MODE_16BIT,
+        drive=None,
+        spi_id=1,
+        baudrate=1_000_000,
+    ):
+        super().__init__(model, cs, sk, di, do, org, drive)
+        self._spi = SPI(
+            spi_id,
+            baudrate=baudrate,
+            polarity=0,
+            phase=0,
+            firstbit=SPI.MSB,
+            sck=self.sk,
+            mosi=self.di,
+            miso=self.do,
+        )
+        self._frame = 0
+        self._frame_bits = 0
+
+    def _select(self):
+        self._frame = 0
+        self._frame_bits = 0
+        super()._select()
+
+    def _deselect(self):
+        if self._frame_bits:
+            nbytes = (self._frame_bits + 7) // 8
+            self._spi.write(self._frame.to_bytes(nbytes, "big"))
+            self._frame_bits = 0
+        super()._deselect()
+
+    def send_bits(self, value: int, length: int):
+        """Append value to the instruction being buffered"""
+        self._frame = (self._frame << length) | (value & ((1 << length) - 1))
+        self._frame_bits += length
+
+    def _send_start_bit(self):
+        self.send_bits(1, 1)
+
+    def _transfer(self, length: int) -> bytearray:
+        """Send the buffered instruction and clock in length(multiple of 8) bits.
+        SPI mode 0 samples DO on the rising edge, a full clock later than the
+        bit-banged read, so one extra clock is spent on the dummy 0 of READ.
+        The received data is the last length // 8 bytes of the returned buffer.
+        """
+        head = (self._frame_bits + 1 + 7) // 8
+        buf = bytearray(head + length // 8)
+        buf[:head] = (self._frame << 1).to_bytes(head, "big")
+        self._spi.write_readinto(buf, buf)
+        self._frame_bits = 0
+        return buf
+
+    def recv_bits(self, length: int) -> int:
+        """Receive a value of given length through a DO pin"""
+        buf = self._transfer(length)
+        return int.from_bytes(buf[len(buf) - length // 8 :], "big")
+
+    def _recv_into(self, buf, count: int):
+        nbytes = self._num_bits // 8
+        rx = self._transfer(count * self._num_bits)
+        offset = len(rx) - count * nbytes
+        if nbytes == 1:
+            buf[:] = rx[offset:]
+            return
+        for n in range(count):
+            buf[n] = rx[offset] << 8 | rx[offset + 1]
+            offset += 2
@@ -25,10 +25,8 @@ def dump_buffer(buf, start=0):
     num_lines = len(buf) // 8
     for nlines in range(num_lines):
         addr = (8 * nlines) + start
-        print(f"0x{addr:02X} ", end="")
-        for v in buf[nlines * 8 : 8 * (nlines + 1)]:
-            print(f"{v:04X} ", end="")
-        print()
+        row = buf[nlines * 8 : 8 * (nlines + 1)]
+        print(f"0x{addr:02X} " + " ".join(f"{v:04X}" for v in row))
 
 
 buf = dev.read_sequential(0, 128)